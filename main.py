@@ -5,101 +5,198 @@ A secure, lightweight command-line password manager with AES-256 encryption and
 """
 
 import os
+import re
 import sys
 import getpass
-import signal
-from modules.config import MASTER_PASSWORD_FILE, SECURE_FOLDER
-from modules.auth import check_or_create_master_password
-from modules.db import initialize_db, add_credential, get_credentials, edit_credential, remove_credential
+import selectors
+import termios
+from modules.config import SECURE_FOLDER
+from modules.auth import check_or_create_master_password, check_master_password, hash_master_password, load_master_hash, save_master_hash
+from modules.db import initialize_db, add_credential, get_credentials, edit_credential, remove_credential, get_credentials_version, credential_exists, update_credential
 from modules.session import SessionManager
+from modules.search import SearchIndex
 from modules.clipboard_utils import copy_to_clipboard
 from modules.json_io import export_credentials_json, import_credentials_json
 from modules.totp_utils import get_or_create_totp_secret, verify_totp, is_totp_enabled, enable_totp, disable_totp
-from modules.utils import load_session_timeout, save_session_timeout
+from modules.utils import load_session_timeout, save_session_timeout, passwords_match
+
+# Static menu text, built once and printed with a single call
+MAIN_MENU = "\n".join([
+    "\n" + "=" * 45,
+    "🔐 PassGuard ",
+    "=" * 45,
+    "1. 👀 View & manage credentials",
+    "2. ➕ Add new credential",
+    "3. 📤 Import/Export",
+    "4. ⚙️  Settings",
+    "5. 🚪 Exit",
+    "-" * 45,
+])
+
+LIST_DIVIDER = "-" * 50 + "\n"
+
+VIEW_ACTIONS_MENU = "\n".join([
+    "\nActions:",
+    "  c) Copy password to clipboard",
+    "  e) Edit credential",
+    "  d) Delete credential",
+    "  b) Back to main menu",
+])
+
+VIEW_ACTIONS_MENU_WITH_NEXT = VIEW_ACTIONS_MENU + "\n  n) Next page"
+
+# Search results shown per page
+RESULTS_PAGE_SIZE = 50
+
+# Menu selections and timeouts: a run of digits, optionally padded; callers range-check
+NUMBER_PATTERN = re.compile(r"\s*(\d+)\s*")
+
+IMPORT_EXPORT_MENU = "\n".join([
+    "\n📤 Import/Export Credentials",
+    "-" * 30,
+    "1. Export credentials (encrypted backup)",
+    "2. Import credentials (restore from backup)",
+    "3. Back to main menu",
+])
+
+SETTINGS_MENU = "\n".join([
+    "\n⚙️  Settings",
+    "-" * 15,
+    "1. Change session timeout",
+    "2. Change master password",
+    "3. Two-factor authentication",
+    "4. Back to main menu",
+])
+
+TWO_FACTOR_MENU_TEMPLATE = "\n".join([
+    "\n🔐 Two-Factor Authentication - {status}",
+    "-" * 35,
+    "1. Enable 2FA",
+    "2. Disable 2FA",
+    "3. Show QR secret",
+    "4. Back to settings",
+])
+
+# Rendered once per 2FA state, keyed by is_totp_enabled()
+TWO_FACTOR_MENUS = {
+    True: TWO_FACTOR_MENU_TEMPLATE.format(status="✅ Enabled"),
+    False: TWO_FACTOR_MENU_TEMPLATE.format(status="❌ Disabled"),
+}
+
+BANNER = """
+╔══════════════════════════════════╗
+║          🔐 PassGuard            ║
+║     Secure • Local • Private     ║
+╚══════════════════════════════════╝
+"""
+
+ADD_CREDENTIAL_HEADER = "\n➕ Add New Credential\n" + "-" * 25
+CHANGE_MASTER_PASSWORD_HEADER = "\n🔑 Change Master Password\n" + "-" * 25
 
 class TimeoutException(Exception):
     """Raised when input times out"""
     pass
 
-def timeout_handler(signum, frame):
-    """Handle timeout signal"""
-    raise TimeoutException
+_stdin_selector = None
+_terminal_attrs = None
+
+def read_line(timeout):
+    """Wait for a line on stdin, raising TimeoutException after timeout seconds"""
+    global _stdin_selector
+    # Piped input is never interactive and may already sit in Python's buffer
+    if sys.stdin.isatty():
+        if _stdin_selector is None:
+            _stdin_selector = selectors.DefaultSelector()
+            _stdin_selector.register(sys.stdin, selectors.EVENT_READ)
+        if not _stdin_selector.select(timeout):
+            raise TimeoutException
+    line = sys.stdin.readline()
+    if not line:
+        raise EOFError
+    return line.rstrip("\n")
 
 def timed_input(prompt, timeout):
     """Get user input with timeout"""
-    signal.signal(signal.SIGALRM, timeout_handler)
-    signal.alarm(timeout)
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
     try:
-        value = input(prompt)
-        signal.alarm(0)
-        return value
+        return read_line(timeout)
     except TimeoutException:
         print("\n⏰ Session timed out.")
         return None
     except KeyboardInterrupt:
         print("\n⚠️ Operation cancelled.")
-        signal.alarm(0)
         return None
-    finally:
-        signal.alarm(0)
 
 def timed_getpass(prompt, timeout):
     """Get password input with timeout"""
-    signal.signal(signal.SIGALRM, timeout_handler)
-    signal.alarm(timeout)
+    if not sys.stdin.isatty():
+        return timed_input(prompt, timeout)
+    
+    global _terminal_attrs
+    fd = sys.stdin.fileno()
+    if _terminal_attrs is None:
+        old_attrs = termios.tcgetattr(fd)
+        new_attrs = termios.tcgetattr(fd)
+        new_attrs[3] &= ~termios.ECHO
+        _terminal_attrs = (old_attrs, new_attrs)
+    old_attrs, new_attrs = _terminal_attrs
+    
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
     try:
-        value = getpass.getpass(prompt)
-        signal.alarm(0)
+        termios.tcsetattr(fd, termios.TCSAFLUSH, new_attrs)
+        value = read_line(timeout)
+        print()
         return value
     except TimeoutException:
         print("\n⏰ Session timed out.")
         return None
     except KeyboardInterrupt:
         print("\n⚠️ Operation cancelled.")
-        signal.alarm(0)
         return None
     finally:
-        signal.alarm(0)
+        termios.tcsetattr(fd, termios.TCSAFLUSH, old_attrs)
 
 def clear_screen():
     """Clear terminal screen"""
-    os.system("clear" if os.name != "nt" else "cls")
-
-def filter_credentials(credentials, query):
-    """Filter credentials by service name"""
-    if not query:
-        return credentials
-    query = query.lower()
-    return [
-        (service, username, password)
-        for (service, username, password) in credentials
-        if query in service.lower() or query in username.lower()
-    ]
+    if sys.stdout.isatty():
+        sys.stdout.write("\x1b[2J\x1b[H")
+        sys.stdout.flush()
+
+def parse_number(text):
+    """Parse a numeric menu entry, returning None if it is not a number"""
+    match = NUMBER_PATTERN.fullmatch(text)
+    if not match:
+        return None
+    try:
+        return int(match.group(1))
+    except ValueError:  # More digits than int() will convert
+        return None
+
+def format_results_page(credentials, matches, start):
+    """Format one page of search results, numbered by position in matches"""
+    return "".join(
+        f"{number:2d}. {credentials[idx][0]:<20} | {credentials[idx][1]}\n"
+        for number, idx in enumerate(matches[start:start + RESULTS_PAGE_SIZE], start + 1)
+    )
 
 def print_banner():
     """Print application banner"""
-    banner = """
-╔══════════════════════════════════╗
-║          🔐 PassGuard            ║
-║     Secure • Local • Private     ║
-╚══════════════════════════════════╝
-"""
-    print(banner)
+    print(BANNER)
 
 def confirm_action(message, session):
     """Get user confirmation for sensitive actions"""
     response = timed_input(f"{message} (y/N): ", session.timeout)
     return response and response.lower() == 'y'
 
-def verify_master_password():
-    """Verify master password for sensitive operations"""
-    import bcrypt
-    with open(MASTER_PASSWORD_FILE, "rb") as f:
-        stored_hash = f.read()
+def verify_master_password(prompt="Enter master password: "):
+    """Verify master password for sensitive operations, allowing three attempts"""
+    stored_hash = load_master_hash()
     
     for attempt in range(3):
-        password = getpass.getpass("Enter master password: ")
-        if bcrypt.checkpw(password.encode(), stored_hash):
+        password = getpass.getpass(prompt)
+        if check_master_password(password, stored_hash):
             return True
         print(f"❌ Incorrect password. {2-attempt} attempts remaining.")
     print("❌ Too many failed attempts.")
@@ -125,12 +222,18 @@ def verify_2fa_for_critical_operations(operation_name, session):
 
 def handle_view_credentials(session):
     """Handle viewing and managing credentials"""
+    cached_version = None
     while True:
-        all_credentials = get_credentials()
-        if not all_credentials:
-            print("📝 No credentials stored yet.")
-            print("💡 Use option 2 from the main menu to add your first credential.")
-            break
+        # Only reload (and re-decrypt) the vault after it has been written to
+        version = get_credentials_version()
+        if version != cached_version:
+            cached_version = version
+            all_credentials = get_credentials()
+            if not all_credentials:
+                print("📝 No credentials stored yet.")
+                print("💡 Use option 2 from the main menu to add your first credential.")
+                break
+            search_index = SearchIndex(all_credentials)
 
         search_query = timed_input("🔍 Search for service (Enter for all): ", session.timeout)
         if search_query is None:
@@ -138,76 +241,84 @@ def handle_view_credentials(session):
             break
             
         session.refresh()
-        filtered_credentials = filter_credentials(all_credentials, search_query.strip())
+        # Indices into all_credentials; rows are only formatted a page at a time
+        matches = search_index.matching_rows(search_query.strip().casefold())
         
-        if not filtered_credentials:
+        if not matches:
             print("❌ No matching credentials found.")
             continue
 
-        print(f"\n🔐 Found {len(filtered_credentials)} credential(s):")
-        print("-" * 50)
-        for idx, (service, username, _) in enumerate(filtered_credentials, 1):
-            print(f"{idx:2d}. {service:<20} | {username}")
-        print("-" * 50)
-        
-        print("\nActions:")
-        print("  c) Copy password to clipboard")
-        print("  e) Edit credential")
-        print("  d) Delete credential")
-        print("  b) Back to main menu")
-        
-        action = timed_input("Choose action: ", session.timeout)
-        if action is None:
-            session.lock()
+        page_start = 0
+        while True:
+            page_end = min(page_start + RESULTS_PAGE_SIZE, len(matches))
+            has_more = page_end < len(matches)
+            header = f"\n🔐 Found {len(matches)} credential(s):\n"
+            if len(matches) > RESULTS_PAGE_SIZE:
+                header = f"\n🔐 Found {len(matches)} credential(s), showing {page_start + 1}-{page_end}:\n"
+            sys.stdout.write(
+                f"{header}{LIST_DIVIDER}{format_results_page(all_credentials, matches, page_start)}"
+                f"{LIST_DIVIDER}{VIEW_ACTIONS_MENU_WITH_NEXT if has_more else VIEW_ACTIONS_MENU}\n"
+            )
+            
+            action = timed_input("Choose action: ", session.timeout)
+            if action is None:
+                session.lock()
+                return
+            action = action.strip().lower()
+            if action == 'n' and has_more:
+                session.refresh()
+                page_start = page_end
+                continue
             break
-        if action.lower() == 'b':
+        
+        if action == 'b':
             break
             
         session.refresh()
         
-        if action.lower() == 'c':
-            handle_copy_password(filtered_credentials, session)
-        elif action.lower() == 'e':
-            handle_edit_credential(filtered_credentials, all_credentials, session)
-        elif action.lower() == 'd':
-            handle_delete_credential(filtered_credentials, all_credentials, session)
+        if action == 'c':
+            handle_copy_password(matches, all_credentials, session)
+        elif action == 'e':
+            handle_edit_credential(matches, all_credentials, search_index, session)
+        elif action == 'd':
+            handle_delete_credential(matches, all_credentials, session)
         else:
             print("❌ Invalid option.")
 
-def handle_copy_password(filtered_credentials, session):
+def handle_copy_password(matches, all_credentials, session):
     """Handle copying password to clipboard"""
     sel = timed_input("Enter credential number: ", session.timeout)
     if sel is None:
         session.lock()
         return
     
-    try:
-        sel = int(sel)
-        if 1 <= sel <= len(filtered_credentials):
-            _, _, password = filtered_credentials[sel - 1]
-            copy_to_clipboard(password)
-            print("✅ Password copied to clipboard!")
-        else:
-            print("❌ Invalid selection.")
-    except ValueError:
+    sel = parse_number(sel)
+    if sel is None:
         print("❌ Please enter a valid number.")
+    elif 1 <= sel <= len(matches):
+        _, _, password = all_credentials[matches[sel - 1]]
+        copy_to_clipboard(password)
+        print("✅ Password copied to clipboard!")
+    else:
+        print("❌ Invalid selection.")
 
-def handle_edit_credential(filtered_credentials, all_credentials, session):
+def handle_edit_credential(matches, all_credentials, search_index, session):
     """Handle editing a credential with duplicate checking"""
     sel = timed_input("Enter credential number to edit: ", session.timeout)
     if sel is None:
         session.lock()
         return
     
+    sel = parse_number(sel)
+    if sel is None:
+        print("❌ Please enter a valid number.")
+        return
+    
     try:
-        sel = int(sel)
-        if 1 <= sel <= len(filtered_credentials):
-            cred = filtered_credentials[sel - 1]
-            try:
-                idx_in_all = all_credentials.index(cred) + 1
-            except ValueError:
-                print("❌ Error: Credential not found in database.")
-                return
+        if 1 <= sel <= len(matches):
+            orig_idx = matches[sel - 1]
+            cred = all_credentials[orig_idx]
+            idx_in_all = orig_idx + 1
             
             old_service, old_username, old_password = cred
             
@@ -228,13 +339,9 @@ def handle_edit_credential(filtered_credentials, all_credentials, session):
 
             # Check for duplicate
             if new_service != old_service or new_username != old_username:
-                duplicate_found = False
-                for idx, (s, u, _) in enumerate(all_credentials):
-                    if idx == idx_in_all - 1:
-                        continue
-                    if s.lower() == new_service.lower() and u.lower() == new_username.lower():
-                        duplicate_found = True
-                        break
+                duplicate_found = any(
+                    row != orig_idx for row in search_index.find_rows(new_service, new_username)
+                )
 
                 if duplicate_found:
                     print("❌ Cannot update: Duplicate credential detected!")
@@ -267,7 +374,7 @@ def handle_edit_credential(filtered_credentials, all_credentials, session):
                             session.lock()
                             return
                         
-                        if new_password == confirm_password:
+                        if passwords_match(new_password, confirm_password):
                             password_changed = True
                             break
                         else:
@@ -301,8 +408,6 @@ def handle_edit_credential(filtered_credentials, all_credentials, session):
             if confirm_action("💾 Save changes?", session):
                 try:
                     edit_credential(idx_in_all, new_service, new_username, new_password)
-                    filtered_credentials[sel - 1] = (new_service, new_username, new_password)
-                    all_credentials[idx_in_all - 1] = (new_service, new_username, new_password)
                     print("✅ Credential updated successfully!")
                 except Exception as e:
                     error_msg = str(e).lower()
@@ -315,53 +420,43 @@ def handle_edit_credential(filtered_credentials, all_credentials, session):
                 print("❌ Changes cancelled.")
         else:
             print("❌ Invalid selection.")
-    except ValueError:
-        print("❌ Please enter a valid number.")
     except Exception as e:
         print(f"❌ Error: {e}")
 
-def handle_delete_credential(filtered_credentials, all_credentials, session):
+def handle_delete_credential(matches, all_credentials, session):
     """Handle deleting a credential"""
     sel = timed_input("Enter credential number to delete: ", session.timeout)
     if sel is None:
         session.lock()
         return
     
+    sel = parse_number(sel)
+    if sel is None:
+        print("❌ Please enter a valid number.")
+        return
+    
     try:
-        sel = int(sel)
-        if 1 <= sel <= len(filtered_credentials):
-            cred = filtered_credentials[sel - 1]
-            service, username, _ = cred
+        if 1 <= sel <= len(matches):
+            orig_idx = matches[sel - 1]
+            service, username, _ = all_credentials[orig_idx]
             
             print(f"\n⚠️ WARNING: Deleting credential for:")
             print(f"   Service: {service}")
             print(f"   Username: {username}")
             
             if confirm_action("❌ Are you sure you want to permanently delete this credential?", session):
-                try:
-                    idx_in_all = all_credentials.index(cred) + 1
-                except ValueError:
-                    print("❌ Error: Credential not found in database.")
-                    return
-                
-                remove_credential(idx_in_all)
+                remove_credential(orig_idx + 1)
                 print("✅ Credential deleted successfully!")
-                
-                del filtered_credentials[sel - 1]
-                all_credentials.remove(cred)
             else:
                 print("❌ Deletion cancelled.")
         else:
             print("❌ Invalid selection.")
-    except ValueError:
-        print("❌ Please enter a valid number.")
     except Exception as e:
         print(f"❌ Error: {e}")
 
 def handle_add_credential(session):
     """Handle adding a new credential with password confirmation and duplicate checking"""
-    print("\n➕ Add New Credential")
-    print("-" * 25)
+    print(ADD_CREDENTIAL_HEADER)
     
     service = timed_input("🔹 Service name: ", session.timeout)
     if service is None:
@@ -385,30 +480,22 @@ def handle_add_credential(session):
             session.lock()
             return
         
-        if password == password_confirm:
+        if passwords_match(password, password_confirm):
             break
         else:
             print("❌ Passwords don't match. Please try again.")
             continue
     
-    if not all([service.strip(), username.strip(), password.strip()]):
-        print("❌ All fields are required.")
-        return
-    
     service = service.strip()
     username = username.strip()
     password = password.strip()
     
-    # Check for duplicates
-    existing_credentials = get_credentials()
-    duplicate_found = False
-    
-    for existing_service, existing_username, _ in existing_credentials:
-        if existing_service.lower() == service.lower() and existing_username.lower() == username.lower():
-            duplicate_found = True
-            break
+    if not (service and username and password):
+        print("❌ All fields are required.")
+        return
     
-    if duplicate_found:
+    # Check for duplicates; only rows for this service are decrypted
+    if credential_exists(service, username):
         print(f"\n⚠️  Duplicate credential detected!")
         print(f"   Service: {service}")
         print(f"   Username: {username}")
@@ -425,12 +512,11 @@ def handle_add_credential(session):
             
             if choice == 'u':
                 try:
-                    credentials = get_credentials()
-                    for idx, (cred_service, cred_username, _) in enumerate(credentials, 1):
-                        if cred_service.lower() == service.lower() and cred_username.lower() == username.lower():
-                            edit_credential(idx, service, username, password)
-                            print("✅ Password updated for existing credential!")
-                            return
+                    if update_credential(service, username, password):
+                        print("✅ Password updated for existing credential!")
+                    else:
+                        print("❌ Existing credential not found.")
+                    return
                 except Exception as e:
                     print(f"❌ Failed to update credential: {e}")
                     return
@@ -460,14 +546,42 @@ def handle_add_credential(session):
     else:
         print("❌ Credential not saved.")
 
+def handle_export_credentials(session):
+    """Handle exporting credentials to an encrypted backup"""
+    path = timed_input("📁 Export file path: ", session.timeout)
+    if path and path.strip():
+        if export_credentials_json(path.strip()):
+            print("✅ Credentials exported successfully!")
+            print("💡 Tip: Keep your backup file secure - it contains encrypted passwords!")
+
+def handle_import_credentials(session):
+    """Handle importing credentials from an encrypted backup"""
+    path = timed_input("📁 Import file path: ", session.timeout)
+    if path and path.strip():
+        try:
+            with session.extended_timeout(3600):
+                result = import_credentials_json(path.strip())
+            
+            if result.imported > 0:
+                print(f"✅ Successfully imported {result.imported} credential(s)!")
+                if result.errors > 0:
+                    print(f"   ⚠️  {result.errors} error(s) occurred")
+            elif result.errors > 0:
+                print(f"\n❌ Import failed with {result.errors} error(s).")
+                print("   Please check the file format and try again.")
+            else:
+                print("\n📝 No credentials were imported.")
+                print("   The backup file may be empty or invalid.")
+                
+        except KeyboardInterrupt:
+            print("\n⚠️  Import cancelled by user.")
+        except Exception as e:
+            print(f"\n❌ Import process failed: {e}")
+
 def handle_import_export(session):
     """Handle import/export operations"""
     while True:
-        print("\n📤 Import/Export Credentials")
-        print("-" * 30)
-        print("1. Export credentials (encrypted backup)")
-        print("2. Import credentials (restore from backup)")
-        print("3. Back to main menu")
+        print(IMPORT_EXPORT_MENU)
         
         choice = timed_input("Select option: ", session.timeout)
         if choice is None or choice == "3":
@@ -475,58 +589,16 @@ def handle_import_export(session):
         
         session.refresh()
         
-        if choice == "1":
-            path = timed_input("📁 Export file path: ", session.timeout)
-            if path and path.strip():
-                if export_credentials_json(path.strip()):
-                    print("✅ Credentials exported successfully!")
-                    print("💡 Tip: Keep your backup file secure - it contains encrypted passwords!")
-                
-        elif choice == "2":
-            path = timed_input("📁 Import file path: ", session.timeout)
-            if path and path.strip():
-                try:
-                    original_timeout = session.timeout
-                    session.timeout = 3600
-                    session.refresh()
-                    
-                    result = import_credentials_json(path.strip())
-                    
-                    session.timeout = original_timeout
-                    session.refresh()
-                    
-                    if result.imported > 0:
-                        print(f"✅ Successfully imported {result.imported} credential(s)!")
-                        if result.errors > 0:
-                            print(f"   ⚠️  {result.errors} error(s) occurred")
-                    elif result.errors > 0:
-                        print(f"\n❌ Import failed with {result.errors} error(s).")
-                        print("   Please check the file format and try again.")
-                    else:
-                        print("\n📝 No credentials were imported.")
-                        print("   The backup file may be empty or invalid.")
-                        
-                except KeyboardInterrupt:
-                    print("\n⚠️  Import cancelled by user.")
-                    session.timeout = original_timeout
-                    session.refresh()
-                except Exception as e:
-                    print(f"\n❌ Import process failed: {e}")
-                    session.timeout = original_timeout
-                    session.refresh()
-                
+        handler = IMPORT_EXPORT_ACTIONS.get(choice)
+        if handler:
+            handler(session)
         else:
             print("❌ Invalid option.")
 
 def handle_settings(session):
     """Handle application settings"""
     while True:
-        print("\n⚙️  Settings")
-        print("-" * 15)
-        print("1. Change session timeout")
-        print("2. Change master password")
-        print("3. Two-factor authentication")
-        print("4. Back to main menu")
+        print(SETTINGS_MENU)
         
         choice = timed_input("Select option: ", session.timeout)
         if choice is None or choice == "4":
@@ -534,12 +606,9 @@ def handle_settings(session):
         
         session.refresh()
         
-        if choice == "1":
-            handle_timeout_settings(session)
-        elif choice == "2":
-            handle_master_password_change(session)
-        elif choice == "3":
-            handle_2fa_settings(session)
+        handler = SETTINGS_ACTIONS.get(choice)
+        if handler:
+            handler(session)
         else:
             print("❌ Invalid option.")
 
@@ -553,35 +622,23 @@ def handle_timeout_settings(session):
         session.lock()
         return
     
-    try:
-        new_timeout = int(new_timeout)
-        if 30 <= new_timeout <= 3600:
-            session.timeout = new_timeout
-            session.refresh()
-            save_session_timeout(new_timeout)
-            print(f"✅ Timeout updated to {new_timeout} seconds!")
-        else:
-            print("❌ Timeout must be between 30 and 3600 seconds.")
-    except ValueError:
+    new_timeout = parse_number(new_timeout)
+    if new_timeout is None:
         print("❌ Please enter a valid number.")
+    elif 30 <= new_timeout <= 3600:
+        session.timeout = new_timeout
+        session.refresh()
+        save_session_timeout(new_timeout)
+        print(f"✅ Timeout updated to {new_timeout} seconds!")
+    else:
+        print("❌ Timeout must be between 30 and 3600 seconds.")
 
 def handle_master_password_change(session):
     """Handle master password change - requires current password + 2FA if enabled"""
-    print("\n🔑 Change Master Password")
-    print("-" * 25)
+    print(CHANGE_MASTER_PASSWORD_HEADER)
     
     # Verify current password
-    import bcrypt
-    with open(MASTER_PASSWORD_FILE, "rb") as f:
-        stored_hash = f.read()
-    
-    for attempt in range(3):
-        current_pw = getpass.getpass("Current master password: ")
-        if bcrypt.checkpw(current_pw.encode(), stored_hash):
-            break
-        print(f"❌ Incorrect password. {2-attempt} attempts remaining.")
-    else:
-        print("❌ Too many failed attempts.")
+    if not verify_master_password("Current master password: "):
         return
     
     # 2FA verification ONLY for master password change
@@ -592,7 +649,7 @@ def handle_master_password_change(session):
     while True:
         new_pw = getpass.getpass("New master password: ")
         confirm_pw = getpass.getpass("Confirm new password: ")
-        if new_pw == confirm_pw:
+        if passwords_match(new_pw, confirm_pw):
             if len(new_pw) >= 8:
                 break
             else:
@@ -601,23 +658,42 @@ def handle_master_password_change(session):
             print("❌ Passwords don't match. Try again.")
     
     # Save new password
-    hashed = bcrypt.hashpw(new_pw.encode(), bcrypt.gensalt())
-    with open(MASTER_PASSWORD_FILE, "wb") as f:
-        f.write(hashed)
+    save_master_hash(hash_master_password(new_pw))
     print("✅ Master password changed successfully!")
 
+def handle_enable_2fa(session):
+    """Handle enabling 2FA"""
+    if not is_totp_enabled():
+        enable_totp()
+        print("✅ 2FA has been enabled!")
+        print("💡 Use an authenticator app to scan the QR code or enter the secret manually.")
+    else:
+        print("ℹ️  2FA is already enabled.")
+
+def handle_disable_2fa(session):
+    """Handle disabling 2FA - requires a current 2FA code"""
+    if is_totp_enabled():
+        # 2FA verification ONLY for disabling 2FA
+        if verify_2fa_for_critical_operations("disable 2FA", session):
+            disable_totp()
+            print("✅ 2FA has been disabled.")
+    else:
+        print("ℹ️  2FA is not enabled.")
+
+def handle_show_totp_secret(session):
+    """Handle showing the TOTP secret - requires the master password"""
+    if verify_master_password():
+        secret = get_or_create_totp_secret()
+        print(f"\n📱 TOTP Secret (scan with authenticator app):")
+        print(f"🔑 {secret}")
+        print("\n💡 Compatible apps: Google Authenticator, Authy, 1Password")
+    else:
+        print("❌ Master password verification failed.")
+
 def handle_2fa_settings(session):
     """Handle 2FA settings"""
     while True:
-        enabled = is_totp_enabled()
-        status = "✅ Enabled" if enabled else "❌ Disabled"
-        
-        print(f"\n🔐 Two-Factor Authentication - {status}")
-        print("-" * 35)
-        print("1. Enable 2FA")
-        print("2. Disable 2FA")
-        print("3. Show QR secret")
-        print("4. Back to settings")
+        print(TWO_FACTOR_MENUS[is_totp_enabled()])
         
         choice = timed_input("Select option: ", session.timeout)
         if choice is None or choice == "4":
@@ -625,34 +701,37 @@ def handle_2fa_settings(session):
         
         session.refresh()
         
-        if choice == "1":
-            if not enabled:
-                enable_totp()
-                print("✅ 2FA has been enabled!")
-                print("💡 Use an authenticator app to scan the QR code or enter the secret manually.")
-            else:
-                print("ℹ️  2FA is already enabled.")
-                
-        elif choice == "2":
-            if enabled:
-                # 2FA verification ONLY for disabling 2FA
-                if verify_2fa_for_critical_operations("disable 2FA", session):
-                    disable_totp()
-                    print("✅ 2FA has been disabled.")
-            else:
-                print("ℹ️  2FA is not enabled.")
-                
-        elif choice == "3":
-            if verify_master_password():
-                secret = get_or_create_totp_secret()
-                print(f"\n📱 TOTP Secret (scan with authenticator app):")
-                print(f"🔑 {secret}")
-                print("\n💡 Compatible apps: Google Authenticator, Authy, 1Password")
-            else:
-                print("❌ Master password verification failed.")
+        handler = TWO_FACTOR_ACTIONS.get(choice)
+        if handler:
+            handler(session)
         else:
             print("❌ Invalid option.")
 
+# Menu choice -> handler(session)
+MAIN_ACTIONS = {
+    "1": handle_view_credentials,
+    "2": handle_add_credential,
+    "3": handle_import_export,
+    "4": handle_settings,
+}
+
+SETTINGS_ACTIONS = {
+    "1": handle_timeout_settings,
+    "2": handle_master_password_change,
+    "3": handle_2fa_settings,
+}
+
+IMPORT_EXPORT_ACTIONS = {
+    "1": handle_export_credentials,
+    "2": handle_import_credentials,
+}
+
+TWO_FACTOR_ACTIONS = {
+    "1": handle_enable_2fa,
+    "2": handle_disable_2fa,
+    "3": handle_show_totp_secret,
+}
+
 def main():
     """Main application entry point"""
     try:
@@ -689,15 +768,7 @@ def main():
                 continue
             
             # Main menu
-            print("\n" + "="*45)
-            print("🔐 PassGuard ")
-            print("="*45)
-            print("1. 👀 View & manage credentials")
-            print("2. ➕ Add new credential")
-            print("3. 📤 Import/Export")
-            print("4. ⚙️  Settings")
-            print("5. 🚪 Exit")
-            print("-"*45)
+            print(MAIN_MENU)
             
             choice = timed_input("Select option (1-5): ", session.timeout)
             if choice is None:
@@ -707,14 +778,9 @@ def main():
             session.refresh()
             
             # Handle menu choices
-            if choice == "1":
-                handle_view_credentials(session)
-            elif choice == "2":
-                handle_add_credential(session)
-            elif choice == "3":
-                handle_import_export(session)
-            elif choice == "4":
-                handle_settings(session)
+            handler = MAIN_ACTIONS.get(choice)
+            if handler:
+                handler(session)
             elif choice == "5":
                 print("\n👋 Thank you for using Password Manager!")
                 print("🔒 Your data remains secure and encrypted.")
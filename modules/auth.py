@@ -5,27 +5,39 @@ Handles master password creation, verification, and authentication logic.
 """
 
 import os
-import bcrypt
 import getpass
 import secrets
+import tempfile
 from typing import Optional
-from .config import MASTER_PASSWORD_FILE, SECURE_FOLDER
-from .utils import set_secure_permissions
+from argon2 import PasswordHasher, Type, extract_parameters
+from argon2.exceptions import VerificationError, InvalidHashError
+from .config import MASTER_PASSWORD_FILE, SECURE_FOLDER, ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM
+from .utils import passwords_match
 from .totp_utils import is_totp_enabled, verify_totp
 
+_SYMBOLS = frozenset("!@#$%^&*()_+-=[]{}|;:,.<>?")
+
 class AuthenticationManager:
     """Manages authentication operations for the password manager."""
     
     def __init__(self):
         self.master_file = MASTER_PASSWORD_FILE
         self.max_attempts = 3
+        self._stored_hash = None
+        self._hasher = PasswordHasher(
+            time_cost=ARGON2_TIME_COST,
+            memory_cost=ARGON2_MEMORY_COST,
+            parallelism=ARGON2_PARALLELISM,
+        )
     
     def _ensure_secure_folder(self):
         """Ensure the secure folder exists with proper permissions."""
-        if not os.path.exists(SECURE_FOLDER):
+        try:
             os.makedirs(SECURE_FOLDER, mode=0o700)
-        else:
-            os.chmod(SECURE_FOLDER, 0o700)
+        except FileExistsError:
+            # Only tighten permissions that are actually open to group/others
+            if os.stat(SECURE_FOLDER).st_mode & 0o077:
+                os.chmod(SECURE_FOLDER, 0o700)
     
     def _create_master_password(self) -> bool:
         """
@@ -42,7 +54,7 @@ class AuthenticationManager:
             password = getpass.getpass("🔑 New master password: ")
             confirm = getpass.getpass("🔑 Confirm password: ")
             
-            if password != confirm:
+            if not passwords_match(password, confirm):
                 print("❌ Passwords don't match. Please try again.")
                 continue
             
@@ -62,15 +74,8 @@ class AuthenticationManager:
             break
         
         try:
-            # Hash password with bcrypt
-            salt = bcrypt.gensalt(rounds=12)  # Higher cost factor for security
-            hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-            
             # Save to file
-            with open(self.master_file, "wb") as f:
-                f.write(hashed)
-            
-            set_secure_permissions(self.master_file)
+            self.save_stored_hash(self.hash_password(password))
             print("✅ Master password created successfully!")
             return True
             
@@ -96,18 +101,115 @@ class AuthenticationManager:
         if len(password) >= 12:
             score += 1
         
-        # Character variety checks
-        if any(c.islower() for c in password):
+        # Character variety checks over the distinct characters only
+        chars = set(password)
+        if any(c.islower() for c in chars):
             score += 1
-        if any(c.isupper() for c in password):
+        if any(c.isupper() for c in chars):
             score += 1
-        if any(c.isdigit() for c in password):
+        if any(c.isdigit() for c in chars):
             score += 1
-        if any(c in "!@#$%^&*()_+-=[]{}|;:,.<>?" for c in password):
+        if not chars.isdisjoint(_SYMBOLS):
             score += 1
         
         return min(score, 5)
     
+    def hash_password(self, password: str) -> bytes:
+        """
+        Hash a master password with Argon2id.
+        
+        Args:
+            password (str): Master password
+            
+        Returns:
+            bytes: Encoded hash ($argon2id$v=19$m=...,t=...,p=...$salt$hash)
+        """
+        return self._hasher.hash(password).encode('ascii')
+    
+    def check_password(self, password: str, stored_hash: bytes) -> bool:
+        """
+        Check a password against a stored Argon2id or legacy bcrypt hash.
+        
+        Args:
+            password (str): Password to check
+            stored_hash (bytes): Contents of the master password file
+            
+        Returns:
+            bool: True if the password matches, False otherwise
+        """
+        if stored_hash.startswith(b"$2"):
+            import bcrypt  # Only legacy hashes need it
+            return bcrypt.checkpw(password.encode('utf-8'), stored_hash)
+        try:
+            return self._hasher.verify(stored_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    
+    def _needs_rehash(self, stored_hash: bytes) -> bool:
+        """
+        Check whether a stored hash is bcrypt or uses lower Argon2 costs than configured.
+        
+        Args:
+            stored_hash (bytes): Contents of the master password file
+            
+        Returns:
+            bool: True if the hash should be upgraded, False otherwise
+        """
+        if stored_hash.startswith(b"$2"):
+            return True
+        try:
+            params = extract_parameters(stored_hash.decode('ascii'))
+        except (InvalidHashError, UnicodeDecodeError):
+            return False
+        # Only upgrade; a weaker configuration never downgrades a stored hash
+        return (
+            params.type is not Type.ID
+            or params.time_cost < ARGON2_TIME_COST
+            or params.memory_cost < ARGON2_MEMORY_COST
+            or params.parallelism < ARGON2_PARALLELISM
+        )
+    
+    def _rehash_master_password(self, password: str):
+        """Re-hash the just-verified master password with the current Argon2id settings."""
+        try:
+            self.save_stored_hash(self.hash_password(password))
+        except Exception as e:
+            print(f"⚠️  Could not upgrade master password hash, keeping the existing one: {e}")
+    
+    def load_stored_hash(self) -> bytes:
+        """
+        Read the master password file once and reuse it for the process lifetime.
+        
+        Returns:
+            bytes: Contents of the master password file
+        """
+        if self._stored_hash is None:
+            with open(self.master_file, "rb") as f:
+                self._stored_hash = f.read()
+        return self._stored_hash
+    
+    def save_stored_hash(self, new_hash: bytes):
+        """
+        Write a new master password hash and keep the cached copy in step.
+        
+        The hash goes to an owner-only temp file that is synced and then
+        renamed over the master file, so a failed write leaves the old hash intact.
+        
+        Args:
+            new_hash (bytes): Encoded hash to store
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.master_file), prefix=".master.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(new_hash)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.master_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._stored_hash = new_hash
+    
     def _verify_master_password(self) -> bool:
         """
         Verify the master password with user input.
@@ -120,8 +222,7 @@ class AuthenticationManager:
             return False
         
         try:
-            with open(self.master_file, "rb") as f:
-                stored_hash = f.read()
+            stored_hash = self.load_stored_hash()
         except Exception as e:
             print(f"❌ Failed to read master password file: {e}")
             return False
@@ -133,12 +234,16 @@ class AuthenticationManager:
             try:
                 password = getpass.getpass("🔑 Master password: ")
                 
-                if bcrypt.checkpw(password.encode('utf-8'), stored_hash):
+                if self.check_password(password, stored_hash):
                     # Check for 2FA if enabled
                     if is_totp_enabled():
                         if not self._verify_2fa():
                             return False
                     
+                    # Only rewrite the stored hash once login has fully succeeded
+                    if self._needs_rehash(stored_hash):
+                        self._rehash_master_password(password)
+                    
                     print("✅ Authentication successful!")
                     return True
                 else:
@@ -232,19 +337,13 @@ class AuthenticationManager:
         
         try:
             # Verify current password
-            with open(self.master_file, "rb") as f:
-                stored_hash = f.read()
+            stored_hash = self.load_stored_hash()
             
-            if not bcrypt.checkpw(current_password.encode('utf-8'), stored_hash):
+            if not self.check_password(current_password, stored_hash):
                 return False
             
-            # Create new hash
-            salt = bcrypt.gensalt(rounds=12)
-            new_hash = bcrypt.hashpw(new_password.encode('utf-8'), salt)
-            
-            # Save new password
-            with open(self.master_file, "wb") as f:
-                f.write(new_hash)
+            # Create and save new hash
+            self.save_stored_hash(self.hash_password(new_password))
             
             return True
             
@@ -257,4 +356,20 @@ _auth_manager = AuthenticationManager()
 # Legacy function for backward compatibility
 def check_or_create_master_password() -> bool:
     """Check or create master password (legacy function)."""
-    return _auth_manager.check_or_create_master_password()
\ No newline at end of file
+    return _auth_manager.check_or_create_master_password()
+
+def hash_master_password(password: str) -> bytes:
+    """Hash master password (legacy function)."""
+    return _auth_manager.hash_password(password)
+
+def check_master_password(password: str, stored_hash: bytes) -> bool:
+    """Check master password against stored hash (legacy function)."""
+    return _auth_manager.check_password(password, stored_hash)
+
+def load_master_hash() -> bytes:
+    """Load the stored master password hash (legacy function)."""
+    return _auth_manager.load_stored_hash()
+
+def save_master_hash(new_hash: bytes):
+    """Save a new master password hash (legacy function)."""
+    _auth_manager.save_stored_hash(new_hash)
\ No newline at end of file
@@ -4,6 +4,7 @@ import os
 import sys
 import sqlite3
 from contextlib import contextmanager
+from itertools import groupby
 from datetime import datetime
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'modules'))
@@ -12,6 +13,8 @@ try:
     from modules.config import DATABASE_FILE, SECURE_FOLDER
     from modules.crypto_utils import decrypt_data
     from modules.auth import check_or_create_master_password
+    from modules.db import initialize_db, mark_credentials_changed
+    from modules.utils import passwords_match
 except ImportError as e:
     print(f"❌ Error importing modules: {e}")
     sys.exit(1)
@@ -19,54 +22,68 @@ except ImportError as e:
 class DuplicateCleaner:
     def __init__(self):
         self.db_file = DATABASE_FILE
+        self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
 
     @contextmanager
     def get_connection(self):
-        conn = None
+        # One connection for the cleaner's lifetime keeps the page cache warm between scan and removal
         try:
-            conn = sqlite3.connect(self.db_file)
-            conn.execute("PRAGMA foreign_keys = ON")
-            yield conn
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.db_file)
+                self._conn.execute("PRAGMA foreign_keys = ON")
+                self._conn.execute("PRAGMA cache_size = -20000")  # 20 MB
+            yield self._conn
         except Exception as e:
-            if conn:
-                conn.rollback()
+            if self._conn is not None:
+                self._conn.rollback()
             raise Exception(f"Database error: {e}")
-        finally:
-            if conn:
-                conn.close()
 
     def find_duplicates(self):
         duplicates = {}
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
+                # SQLite groups on the indexed lookup key (a keyed hash of service +
+                # username) and returns only duplicate rows, so nothing else is decrypted.
+                # Rows arrive clustered by key, newest first, so each group is one run.
                 cursor.execute('''
-                    SELECT id, service, username, password, created_at, updated_at
+                    SELECT lookup_key, id, service, username, password, created_at, updated_at
                     FROM credentials
-                    ORDER BY service, username, updated_at DESC
+                    WHERE lookup_key IN (
+                        SELECT lookup_key FROM credentials
+                        GROUP BY lookup_key
+                        HAVING COUNT(*) > 1
+                    )
+                    ORDER BY lookup_key, updated_at DESC, id DESC
                 ''')
-                all_credentials = cursor.fetchall()
-                groups = {}
-                for cred in all_credentials:
-                    cred_id, service, enc_username, enc_password, created_at, updated_at = cred
-                    try:
-                        username = decrypt_data(enc_username)
-                        password = decrypt_data(enc_password)
-                    except Exception as e:
-                        print(f"⚠️  Warning: Could not decrypt credential ID {cred_id}: {e}")
-                        continue
-                    key = f"{service.lower()}||{username.lower()}"
-                    if key not in groups:
-                        groups[key] = []
-                    groups[key].append({
-                        'id': cred_id,
-                        'service': service,
-                        'username': username,
-                        'password': password,
-                        'created_at': created_at,
-                        'updated_at': updated_at
-                    })
-                for key, group in groups.items():
+                for key, rows in groupby(cursor, key=lambda row: row[0]):
+                    group = []
+                    for _, cred_id, service, enc_username, enc_password, created_at, updated_at in rows:
+                        try:
+                            username = decrypt_data(enc_username)
+                            password = decrypt_data(enc_password)
+                        except Exception as e:
+                            print(f"⚠️  Warning: Could not decrypt credential ID {cred_id}: {e}")
+                            continue
+                        group.append({
+                            'id': cred_id,
+                            'service': service,
+                            'username': username,
+                            'password': password,
+                            'created_at': created_at,
+                            'updated_at': updated_at
+                        })
                     if len(group) > 1:
                         duplicates[key] = group
         except Exception as e:
@@ -110,7 +127,7 @@ class DuplicateCleaner:
                 print(f"        Created:  {cred['created_at']}")
                 print(f"        Updated:  {cred['updated_at']}")
                 if j > 0:
-                    match = group[0]['password'] == cred['password']
+                    match = passwords_match(group[0]['password'], cred['password'])
                     print(f"        Password same as kept: {'Yes' if match else 'No'}")
                 print()
 
@@ -125,20 +142,19 @@ class DuplicateCleaner:
             if response not in ['yes', 'y']:
                 print("❌ Operation cancelled.")
                 return 0
-        removed_count = 0
+        to_remove = [cred for group in duplicates.values() for cred in group[1:]]
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                for group in duplicates.values():
-                    for cred in group[1:]:
-                        try:
-                            cursor.execute('DELETE FROM credentials WHERE id = ?', (cred['id'],))
-                            removed_count += 1
-                            print(f"🗑️  Removed: {cred['service']} | {cred['username']} (ID: {cred['id']})")
-                        except Exception as e:
-                            print(f"❌ Failed to remove credential ID {cred['id']}: {e}")
+                cursor.executemany('DELETE FROM credentials WHERE id = ?', [(cred['id'],) for cred in to_remove])
                 conn.commit()
-                print(f"\n✅ Successfully removed {removed_count} duplicate credential(s)!")
+                removed_count = cursor.rowcount
+            mark_credentials_changed()
+            print("\n".join(
+                f"🗑️  Removed: {cred['service']} | {cred['username']} (ID: {cred['id']})"
+                for cred in to_remove
+            ))
+            print(f"\n✅ Successfully removed {removed_count} duplicate credential(s)!")
         except Exception as e:
             print(f"❌ Error during removal: {e}")
             return 0
@@ -172,6 +188,7 @@ def main():
     if not check_or_create_master_password():
         print("❌ Authentication failed!")
         sys.exit(1)
+    initialize_db()  # Adds lookup keys to databases created by older versions
     cleaner = DuplicateCleaner()
     try:
         print("\n🔍 Scanning for duplicate credentials...")
@@ -211,6 +228,8 @@ def main():
     except Exception as e:
         print(f"\n❌ Unexpected error: {e}")
         sys.exit(1)
+    finally:
+        cleaner.close()
 
 if __name__ == "__main__":
     main()
@@ -1,13 +1,20 @@
 import threading
-import pyperclip
+
+# Only one clear is ever pending; a newer copy replaces the older timer
+_clear_timer = None
 
 def clear_clipboard():
+    import pyperclip
     pyperclip.copy('')
     print("[Clipboard] cleared.")
 
 def copy_to_clipboard(text, clear_after=15):
+    global _clear_timer
+    if _clear_timer is not None:
+        _clear_timer.cancel()
+    import pyperclip  # Loaded on first copy rather than at startup
     pyperclip.copy(text)
     print(f"[Clipboard] Password copied. It will be cleared in {clear_after} seconds.")
-    timer = threading.Timer(clear_after, clear_clipboard)
-    timer.daemon = True
-    timer.start()
\ No newline at end of file
+    _clear_timer = threading.Timer(clear_after, clear_clipboard)
+    _clear_timer.daemon = True
+    _clear_timer.start()
\ No newline at end of file
@@ -17,3 +17,23 @@ SESSION_TIMEOUT_FILE = os.path.join(SECURE_FOLDER, ".session_timeout")
 # Permissions
 FOLDER_PERMISSION = 0o700  # Only owner can access folder
 FILE_PERMISSION = 0o600    # Only owner can read/write
+
+def _env_int(name, default, minimum, maximum=2**32 - 1):
+    """Read an integer setting from the environment, falling back to the default if invalid"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        number = None
+    if number is None or not minimum <= number <= maximum:
+        print(f"⚠️  Ignoring {name}={value!r}: expected an integer from {minimum} to {maximum}, using {default}.")
+        return default
+    return number
+
+# Master password hashing (Argon2id); legacy bcrypt hashes and hashes with lower
+# costs are rewritten on login. Tune for the hardware with PASSGUARD_ARGON2_*.
+ARGON2_TIME_COST = _env_int("PASSGUARD_ARGON2_TIME_COST", 3, 1)
+ARGON2_PARALLELISM = _env_int("PASSGUARD_ARGON2_PARALLELISM", 4, 1, 255)
+ARGON2_MEMORY_COST = _env_int("PASSGUARD_ARGON2_MEMORY_COST", 64 * 1024, 8 * ARGON2_PARALLELISM)  # KiB, at least 8 per lane
@@ -1,22 +1,30 @@
 #!/usr/bin/env python3
 """
 Cryptographic Utilities Module
-Handles encryption, decryption, and key management using Fernet (AES-256).
+Handles encryption, decryption, and key management using AES-256-GCM,
+with Fernet kept for backups and for reading fields written by older versions.
 """
 
 import os
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import base64
+import hashlib
+import hmac
+from typing import List, Union
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from .config import FERNET_KEY_FILE
 from .utils import set_secure_permissions
 
 class CryptoManager:
     """Manages cryptographic operations for the password manager."""
     
+    # Leading byte of AES-GCM field tokens; Fernet tokens start with 0x80
+    GCM_VERSION = b"\x81"
+    
     def __init__(self):
         self._fernet = None
+        self._aesgcm = None
+        self._lookup_secret = None
     
     def _generate_key(self):
         """Generate a new Fernet encryption key."""
@@ -47,15 +55,47 @@ class CryptoManager:
             self._fernet = Fernet(key)
         return self._fernet
     
-    def encrypt_data(self, data: str) -> str:
+    def _derive_key(self, label: bytes) -> bytes:
+        """Derive a purpose-specific 32-byte key from the Fernet key, so no second key file is needed."""
+        key = base64.urlsafe_b64decode(self._load_key())
+        return hmac.new(key, label, hashlib.sha256).digest()
+    
+    def _get_aesgcm(self):
+        """Get the AES-256-GCM cipher for credential fields, creating it if necessary."""
+        if self._aesgcm is None:
+            self._aesgcm = AESGCM(self._derive_key(b"PassGuard field encryption"))
+        return self._aesgcm
+    
+    def lookup_key(self, service: str, username: str) -> str:
+        """
+        Compute a keyed hash identifying a service + username pair.
+        
+        Usernames are encrypted with a random IV, so this HMAC-SHA256 of the
+        casefolded pair is what lets the database find a credential (or a
+        duplicate) with an indexed lookup instead of decrypting every row.
+        
+        Args:
+            service (str): Service name
+            username (str): Username/email
+            
+        Returns:
+            str: Hex-encoded HMAC-SHA256 digest
+        """
+        if self._lookup_secret is None:
+            self._lookup_secret = self._derive_key(b"PassGuard credential lookup")
+        
+        message = f"{service.strip().casefold()}\0{username.strip().casefold()}".encode('utf-8')
+        return hmac.new(self._lookup_secret, message, hashlib.sha256).hexdigest()
+    
+    def encrypt_data(self, data: str) -> bytes:
         """
-        Encrypt string data using Fernet.
+        Encrypt string data using AES-256-GCM.
         
         Args:
             data (str): Plain text data to encrypt
             
         Returns:
-            str: Base64 encoded encrypted data
+            bytes: Version byte + 12-byte nonce + ciphertext and tag, stored as a BLOB
             
         Raises:
             Exception: If encryption fails
@@ -64,18 +104,43 @@ class CryptoManager:
             raise ValueError("Data must be a string")
         
         try:
-            fernet = self.get_fernet()
-            encrypted_bytes = fernet.encrypt(data.encode('utf-8'))
-            return encrypted_bytes.decode('utf-8')
+            nonce = os.urandom(12)
+            ciphertext = self._get_aesgcm().encrypt(nonce, data.encode('utf-8'), self.GCM_VERSION)
+            return self.GCM_VERSION + nonce + ciphertext
+        except Exception as e:
+            raise Exception(f"Encryption failed: {e}")
+    
+    def encrypt_batch(self, values: List[str]) -> List[bytes]:
+        """
+        Encrypt many strings with one cipher lookup and one read of random nonces.
+        
+        Args:
+            values (List[str]): Plain text data to encrypt
+            
+        Returns:
+            List[bytes]: Encrypted values in the same format as encrypt_data, in the same order
+            
+        Raises:
+            Exception: If encryption fails
+        """
+        aesgcm_encrypt = self._get_aesgcm().encrypt
+        version = self.GCM_VERSION
+        nonces = os.urandom(12 * len(values))
+        
+        try:
+            return [
+                version + nonces[i:i + 12] + aesgcm_encrypt(nonces[i:i + 12], value.encode('utf-8'), version)
+                for i, value in zip(range(0, len(nonces), 12), values)
+            ]
         except Exception as e:
             raise Exception(f"Encryption failed: {e}")
     
-    def decrypt_data(self, encrypted_data: str) -> str:
+    def decrypt_data(self, encrypted_data: Union[bytes, str]) -> str:
         """
-        Decrypt Fernet encrypted data.
+        Decrypt AES-GCM or legacy Fernet encrypted data.
         
         Args:
-            encrypted_data (str): Base64 encoded encrypted data
+            encrypted_data (Union[bytes, str]): Raw AES-GCM blob, or base64 text written by older versions
             
         Returns:
             str: Decrypted plain text
@@ -83,15 +148,48 @@ class CryptoManager:
         Raises:
             Exception: If decryption fails
         """
-        if not isinstance(encrypted_data, str):
-            raise ValueError("Encrypted data must be a string")
+        if not isinstance(encrypted_data, (bytes, str)):
+            raise ValueError("Encrypted data must be bytes or a string")
         
         try:
-            fernet = self.get_fernet()
-            decrypted_bytes = fernet.decrypt(encrypted_data.encode('utf-8'))
+            token = encrypted_data if isinstance(encrypted_data, bytes) else base64.urlsafe_b64decode(encrypted_data)
+            if token[:1] == self.GCM_VERSION:
+                decrypted_bytes = self._get_aesgcm().decrypt(token[1:13], token[13:], self.GCM_VERSION)
+            else:
+                # Written by an older version; re-encrypted with AES-GCM on its next update
+                decrypted_bytes = self.get_fernet().decrypt(encrypted_data)
             return decrypted_bytes.decode('utf-8')
         except Exception as e:
             raise Exception(f"Decryption failed: {e}")
+    
+    def decrypt_batch(self, encrypted_values: List[Union[bytes, str]]) -> List[str]:
+        """
+        Decrypt many AES-GCM or legacy Fernet values with one cipher lookup.
+        
+        Args:
+            encrypted_values (List[Union[bytes, str]]): Raw AES-GCM blobs or legacy base64 text
+            
+        Returns:
+            List[str]: Decrypted plain text, in the same order
+            
+        Raises:
+            Exception: If any value fails to decrypt
+        """
+        aesgcm_decrypt = self._get_aesgcm().decrypt
+        version = self.GCM_VERSION
+        b64decode = base64.urlsafe_b64decode
+        plain = []
+        
+        try:
+            for encrypted_data in encrypted_values:
+                token = encrypted_data if isinstance(encrypted_data, bytes) else b64decode(encrypted_data)
+                if token[:1] == version:
+                    plain.append(aesgcm_decrypt(token[1:13], token[13:], version).decode('utf-8'))
+                else:
+                    plain.append(self.get_fernet().decrypt(encrypted_data).decode('utf-8'))
+            return plain
+        except Exception as e:
+            raise Exception(f"Decryption failed: {e}")
 
 # Global instance for backward compatibility
 _crypto_manager = CryptoManager()
@@ -109,10 +207,22 @@ def get_fernet():
     """Get Fernet instance (legacy function)."""
     return _crypto_manager.get_fernet()
 
-def encrypt_data(data: str) -> str:
+def lookup_key(service: str, username: str) -> str:
+    """Compute credential lookup key (legacy function)."""
+    return _crypto_manager.lookup_key(service, username)
+
+def encrypt_data(data: str) -> bytes:
     """Encrypt data (legacy function)."""
     return _crypto_manager.encrypt_data(data)
 
-def decrypt_data(encrypted_data: str) -> str:
+def encrypt_batch(values: List[str]) -> List[bytes]:
+    """Encrypt many values (legacy function)."""
+    return _crypto_manager.encrypt_batch(values)
+
+def decrypt_data(encrypted_data: Union[bytes, str]) -> str:
     """Decrypt data (legacy function)."""
-    return _crypto_manager.decrypt_data(encrypted_data)
\ No newline at end of file
+    return _crypto_manager.decrypt_data(encrypted_data)
+
+def decrypt_batch(encrypted_values: List[Union[bytes, str]]) -> List[str]:
+    """Decrypt many values (legacy function)."""
+    return _crypto_manager.decrypt_batch(encrypted_values)
\ No newline at end of file
@@ -7,11 +7,12 @@ Simplified version without duplicate detection for imports.
 
 import sqlite3
 import os
+import atexit
 from contextlib import contextmanager
-from typing import List, Tuple, Optional
-from .config import DATABASE_FILE
+from typing import List, Set, Tuple, Optional
+from .config import DATABASE_FILE, FILE_PERMISSION
 from .utils import set_secure_permissions
-from .crypto_utils import encrypt_data, decrypt_data
+from .crypto_utils import encrypt_data, encrypt_batch, decrypt_data, decrypt_batch, lookup_key
 
 class DuplicateCredentialError(Exception):
     """Raised when attempting to add duplicate credentials."""
@@ -25,26 +26,53 @@ class DatabaseManager:
     
     def __init__(self):
         self.db_file = DATABASE_FILE
+        self._version = 0  # Bumped on every successful write
+        self._conn = None
+        # Row ids in listing order from the last get_credentials, valid while the version is unchanged
+        self._listed_ids = None
+        self._listed_version = None
+        self._count = None
+        self._count_version = None
     
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections."""
-        conn = None
+        """
+        Context manager for the database connection.
+        
+        The connection is opened on first use and kept for the process
+        lifetime, so each operation skips the open and page-cache warmup.
+        WAL with synchronous=NORMAL syncs at checkpoints instead of on
+        every commit.
+        """
         try:
-            conn = sqlite3.connect(self.db_file)
-            conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign keys
-            yield conn
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.db_file)
+                self._conn.executescript('''
+                    PRAGMA journal_mode = WAL;
+                    PRAGMA synchronous = NORMAL;
+                    PRAGMA temp_store = MEMORY;
+                    PRAGMA cache_size = -64000;
+                    PRAGMA foreign_keys = ON;
+                ''')
+            yield self._conn
         except Exception as e:
-            if conn:
-                conn.rollback()
+            if self._conn is not None:
+                self._conn.rollback()
             raise Exception(f"Database error: {e}")
-        finally:
-            if conn:
-                conn.close()
+    
+    def close(self):
+        """Close the database connection, checkpointing the WAL into the main file."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
     
     def initialize_db(self):
         """Initialize the database with required tables."""
         if not os.path.exists(self.db_file):
+            # Create the file owner-only before SQLite opens it: the WAL and
+            # shared-memory sidecars copy the database file's permissions
+            os.close(os.open(self.db_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, FILE_PERMISSION))
+            
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
@@ -53,8 +81,9 @@ class DatabaseManager:
                     CREATE TABLE IF NOT EXISTS credentials (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
                         service TEXT NOT NULL,
-                        username TEXT NOT NULL,
-                        password TEXT NOT NULL,
+                        username BLOB NOT NULL,
+                        password BLOB NOT NULL,
+                        lookup_key TEXT,
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                         updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                     )
@@ -76,6 +105,74 @@ class DatabaseManager:
                 print("🗄️  Database initialized successfully.")
             
             set_secure_permissions(self.db_file)
+        
+        self._upgrade_schema()
+    
+    def _upgrade_schema(self):
+        """
+        Add the lookup_key column and listing indexes to databases created by older versions.
+        
+        Runs in one explicit transaction, since sqlite3 would otherwise
+        autocommit the ALTER TABLE before the backfill. Rows still missing a
+        lookup key are filled in on every start; rows that cannot be
+        decrypted are reported and retried next time.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            cursor.execute("PRAGMA table_info(credentials)")
+            columns = [row[1] for row in cursor.fetchall()]
+            
+            if "lookup_key" not in columns:
+                cursor.execute("ALTER TABLE credentials ADD COLUMN lookup_key TEXT")
+            
+            # Not unique: imports may already have stored duplicates
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_lookup_key 
+                ON credentials(lookup_key)
+            ''')
+            
+            # Matches the listing ORDER BY, so listings walk the index instead of sorting
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_service_nocase 
+                ON credentials(service COLLATE NOCASE, id)
+            ''')
+            
+            cursor.execute("SELECT id, service, username FROM credentials WHERE lookup_key IS NULL")
+            updates = []
+            for cred_id, service, enc_username in cursor.fetchall():
+                try:
+                    updates.append((lookup_key(service, decrypt_data(enc_username)), cred_id))
+                except Exception as e:
+                    print(f"⚠️  Warning: Could not decrypt credential ID {cred_id}: {e}")
+            cursor.executemany("UPDATE credentials SET lookup_key = ? WHERE id = ?", updates)
+            conn.commit()
+    
+    def find_credential_id(self, service: str, username: str, exclude_id: Optional[int] = None) -> Optional[int]:
+        """
+        Find a credential by service and username (case-insensitive).
+        
+        Usernames are encrypted with a random IV, so rows are matched on
+        their lookup_key (a keyed hash of the pair) through an index.
+        
+        Args:
+            service (str): Service name
+            username (str): Username/email
+            exclude_id (Optional[int]): ID to exclude from check (for editing)
+            
+        Returns:
+            Optional[int]: Credential ID if found, None otherwise
+        """
+        with self.get_connection() as conn:
+            rows = conn.execute('''
+                SELECT id FROM credentials 
+                WHERE lookup_key = ?
+            ''', (lookup_key(service, username),))
+            
+            for (cred_id,) in rows:
+                if cred_id != exclude_id:
+                    return cred_id
+        return None
     
     def credential_exists(self, service: str, username: str, exclude_id: Optional[int] = None) -> bool:
         """
@@ -90,22 +187,7 @@ class DatabaseManager:
             bool: True if credential exists, False otherwise
         """
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                if exclude_id is not None:
-                    cursor.execute('''
-                        SELECT COUNT(*) FROM credentials 
-                        WHERE LOWER(service) = LOWER(?) AND username = ? AND id != ?
-                    ''', (service.strip(), encrypt_data(username.strip()), exclude_id))
-                else:
-                    cursor.execute('''
-                        SELECT COUNT(*) FROM credentials 
-                        WHERE LOWER(service) = LOWER(?) AND username = ?
-                    ''', (service.strip(), encrypt_data(username.strip())))
-                
-                count = cursor.fetchone()[0]
-                return count > 0
+            return self.find_credential_id(service, username, exclude_id) is not None
         except Exception:
             return False
     
@@ -121,13 +203,15 @@ class DatabaseManager:
             Optional[Tuple[str, str, str]]: (service, username, password) if found, None otherwise
         """
         try:
+            cred_id = self.find_credential_id(service, username)
+            if cred_id is None:
+                return None
+            
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
+                result = conn.execute('''
                     SELECT service, username, password FROM credentials 
-                    WHERE LOWER(service) = LOWER(?) AND username = ?
-                ''', (service.strip(), encrypt_data(username.strip())))
-                result = cursor.fetchone()
+                    WHERE id = ?
+                ''', (cred_id,)).fetchone()
                 
                 if result:
                     service, enc_username, enc_password = result
@@ -152,34 +236,80 @@ class DatabaseManager:
             Exception: If database operation fails
         """
         # Validate input
-        if not all([service.strip(), username.strip(), password.strip()]):
-            raise ValueError("Service, username, and password cannot be empty.")
-        
         service = service.strip()
         username = username.strip()
         password = password.strip()
         
-        # Check for duplicates if not allowed
-        if not allow_duplicates and self.credential_exists(service, username):
-            raise DuplicateCredentialError(service, username)
+        if not (service and username and password):
+            raise ValueError("Service, username, and password cannot be empty.")
+        
+        key = lookup_key(service, username)
+        row = (service, encrypt_data(username), encrypt_data(password), key)
         
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO credentials (service, username, password)
-                    VALUES (?, ?, ?)
-                ''', (service, encrypt_data(username), encrypt_data(password)))
-                conn.commit()
+            with self.get_connection() as conn, conn:
+                if allow_duplicates:
+                    cursor = conn.execute('''
+                        INSERT INTO credentials (service, username, password, lookup_key)
+                        VALUES (?, ?, ?, ?)
+                    ''', row)
+                else:
+                    # Duplicate check and insert in one statement, probing idx_lookup_key
+                    cursor = conn.execute('''
+                        INSERT INTO credentials (service, username, password, lookup_key)
+                        SELECT ?, ?, ?, ?
+                        WHERE NOT EXISTS (SELECT 1 FROM credentials WHERE lookup_key = ?)
+                    ''', row + (key,))
+                inserted = cursor.rowcount > 0
         except sqlite3.IntegrityError:
             # This handles database-level constraints
             if not allow_duplicates:
                 raise DuplicateCredentialError(service, username)
             # If duplicates are allowed, we could try to update instead
             # but for simplicity, we'll just ignore the error
-            pass
+            return
         except Exception as e:
             raise Exception(f"Failed to add credential: {e}")
+        
+        if not inserted:
+            raise DuplicateCredentialError(service, username)
+        self._version += 1
+    
+    def add_credentials(self, credentials: List[Tuple[str, str, str]]) -> int:
+        """
+        Add many credentials in a single transaction, without duplicate checks.
+        
+        Args:
+            credentials (List[Tuple[str, str, str]]): Validated, stripped (service, username, password) tuples
+            
+        Returns:
+            int: Number of credentials inserted
+            
+        Raises:
+            Exception: If database operation fails
+        """
+        # Encrypt all usernames and passwords in one batch
+        count = len(credentials)
+        encrypted = encrypt_batch([username for _, username, _ in credentials] +
+                                  [password for _, _, password in credentials])
+        rows = [
+            (service, enc_username, enc_password, lookup_key(service, username))
+            for (service, username, _), enc_username, enc_password
+            in zip(credentials, encrypted[:count], encrypted[count:])
+        ]
+        
+        try:
+            with self.get_connection() as conn, conn:
+                # One executemany in one transaction instead of a connection per row
+                cursor = conn.executemany('''
+                    INSERT OR IGNORE INTO credentials (service, username, password, lookup_key)
+                    VALUES (?, ?, ?, ?)
+                ''', rows)
+                if cursor.rowcount > 0:
+                    self._version += 1
+                return cursor.rowcount
+        except Exception as e:
+            raise Exception(f"Failed to add credentials: {e}")
     
     def update_credential(self, service: str, username: str, new_password: str):
         """
@@ -194,15 +324,19 @@ class DatabaseManager:
             bool: True if credential was updated, False if not found
         """
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
+            cred_id = self.find_credential_id(service, username)
+            if cred_id is None:
+                return False
+            
+            with self.get_connection() as conn, conn:
+                cursor = conn.execute('''
                     UPDATE credentials
                     SET password = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE LOWER(service) = LOWER(?) AND username = ?
-                ''', (encrypt_data(new_password), service.strip(), encrypt_data(username.strip())))
+                    WHERE id = ?
+                ''', (encrypt_data(new_password), cred_id))
                 
-                conn.commit()
+                if cursor.rowcount > 0:
+                    self._version += 1
                 return cursor.rowcount > 0
         except Exception as e:
             raise Exception(f"Failed to update credential: {e}")
@@ -218,17 +352,24 @@ class DatabaseManager:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
-                    SELECT service, username, password 
+                    SELECT id, service, username, password 
                     FROM credentials 
-                    ORDER BY LOWER(service), LOWER(username)
+                    ORDER BY service COLLATE NOCASE, id
                 ''')
                 records = cursor.fetchall()
                 
-                # Decrypt usernames and passwords
-                return [
-                    (service, decrypt_data(username), decrypt_data(password))
-                    for service, username, password in records
-                ]
+                # Decrypt all usernames and passwords in one batch
+                count = len(records)
+                plain = decrypt_batch([username for _, _, username, _ in records] +
+                                      [password for _, _, _, password in records])
+                credentials = list(zip((service for _, service, _, _ in records), plain[:count], plain[count:]))
+                
+                # Remember the listing so an index picked from it resolves without re-sorting
+                self._listed_ids = [cred_id for cred_id, _, _, _ in records]
+                self._listed_version = self._version
+                self._count = count
+                self._count_version = self._version
+                return credentials
         except Exception as e:
             print(f"❌ Failed to retrieve credentials: {e}")
             return []
@@ -243,20 +384,31 @@ class DatabaseManager:
         Returns:
             Optional[Tuple[int, str, str, str]]: (id, service, username, password) if found, None otherwise
         """
+        if index < 1:
+            return None
+        
         try:
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT id, service, username, password 
-                    FROM credentials 
-                    ORDER BY LOWER(service), LOWER(username)
-                ''')
-                records = cursor.fetchall()
+                if self._listed_version == self._version:
+                    if index > len(self._listed_ids):
+                        return None
+                    record = conn.execute('''
+                        SELECT id, service, username, password 
+                        FROM credentials 
+                        WHERE id = ?
+                    ''', (self._listed_ids[index - 1],)).fetchone()
+                else:
+                    # Let SQLite skip to the row instead of fetching the whole table
+                    record = conn.execute('''
+                        SELECT id, service, username, password 
+                        FROM credentials 
+                        ORDER BY service COLLATE NOCASE, id
+                        LIMIT 1 OFFSET ?
+                    ''', (index - 1,)).fetchone()
                 
-                if index < 1 or index > len(records):
+                if record is None:
                     return None
                 
-                record = records[index - 1]
                 cred_id, service, enc_username, enc_password = record
                 
                 return (cred_id, service, decrypt_data(enc_username), decrypt_data(enc_password))
@@ -279,13 +431,13 @@ class DatabaseManager:
             DuplicateCredentialError: If new service+username combination already exists
             Exception: If database operation fails
         """
-        if not all([new_service.strip(), new_username.strip(), new_password.strip()]):
-            raise ValueError("Service, username, and password cannot be empty.")
-        
         new_service = new_service.strip()
         new_username = new_username.strip()
         new_password = new_password.strip()
         
+        if not (new_service and new_username and new_password):
+            raise ValueError("Service, username, and password cannot be empty.")
+        
         # Get the credential to edit
         credential = self.get_credential_by_index(index)
         if credential is None:
@@ -294,26 +446,24 @@ class DatabaseManager:
         cred_id, current_service, current_username, current_password = credential
         
         # Check if we're changing to a duplicate (excluding current record)
-        if (new_service.lower() != current_service.lower() or 
-            new_username.lower() != current_username.lower()):
+        if (new_service.casefold() != current_service.casefold() or 
+            new_username.casefold() != current_username.casefold()):
             if self.credential_exists(new_service, new_username, exclude_id=cred_id):
                 raise DuplicateCredentialError(new_service, new_username)
         
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
+            with self.get_connection() as conn, conn:
                 # Update the credential
-                cursor.execute('''
+                cursor = conn.execute('''
                     UPDATE credentials
-                    SET service = ?, username = ?, password = ?, updated_at = CURRENT_TIMESTAMP
+                    SET service = ?, username = ?, password = ?, lookup_key = ?, updated_at = CURRENT_TIMESTAMP
                     WHERE id = ?
-                ''', (new_service, encrypt_data(new_username), encrypt_data(new_password), cred_id))
-                
-                conn.commit()
+                ''', (new_service, encrypt_data(new_username), encrypt_data(new_password),
+                      lookup_key(new_service, new_username), cred_id))
                 
                 if cursor.rowcount == 0:
                     raise Exception("No credential was updated.")
+                self._version += 1
                     
         except sqlite3.IntegrityError:
             raise DuplicateCredentialError(new_service, new_username)
@@ -341,36 +491,63 @@ class DatabaseManager:
         cred_id = credential[0]
         
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
+            with self.get_connection() as conn, conn:
                 # Delete the credential
-                cursor.execute('DELETE FROM credentials WHERE id = ?', (cred_id,))
-                conn.commit()
+                cursor = conn.execute('DELETE FROM credentials WHERE id = ?', (cred_id,))
                 
                 if cursor.rowcount == 0:
                     raise Exception("No credential was deleted.")
+                self._version += 1
                     
         except Exception as e:
             raise Exception(f"Failed to remove credential: {e}")
     
+    def get_lookup_keys(self) -> Set[str]:
+        """
+        Get the lookup keys of all stored credentials, read from idx_lookup_key without decrypting.
+        
+        Returns:
+            Set[str]: Lookup keys (see crypto_utils.lookup_key)
+        """
+        with self.get_connection() as conn:
+            return {key for (key,) in conn.execute('SELECT lookup_key FROM credentials')}
+    
+    def get_version(self) -> int:
+        """
+        Get the write version of the credential store.
+        
+        Returns:
+            int: Counter incremented by every add, update, edit, or removal
+        """
+        return self._version
+    
+    def mark_changed(self):
+        """Bump the write version after credentials were changed through another connection."""
+        self._version += 1
+    
     def get_credential_count(self) -> int:
         """
         Get the total number of stored credentials.
         
+        The count is cached until the next write, and a listing refreshes it for free.
+        
         Returns:
             int: Number of credentials
         """
+        if self._count_version == self._version:
+            return self._count
+        
         try:
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT COUNT(*) FROM credentials')
-                return cursor.fetchone()[0]
+                self._count = conn.execute('SELECT COUNT(*) FROM credentials').fetchone()[0]
+                self._count_version = self._version
+                return self._count
         except Exception:
             return 0
 
 # Global instance for backward compatibility
 _db_manager = DatabaseManager()
+atexit.register(_db_manager.close)
 
 # Legacy functions for backward compatibility
 def initialize_db():
@@ -381,6 +558,14 @@ def add_credential(service: str, username: str, password: str, allow_duplicates:
     """Add credential (legacy function)."""
     return _db_manager.add_credential(service, username, password, allow_duplicates)
 
+def add_credentials(credentials: List[Tuple[str, str, str]]) -> int:
+    """Add credentials in one transaction (legacy function)."""
+    return _db_manager.add_credentials(credentials)
+
+def update_credential(service: str, username: str, new_password: str) -> bool:
+    """Update credential password (legacy function)."""
+    return _db_manager.update_credential(service, username, new_password)
+
 def get_credentials() -> List[Tuple[str, str, str]]:
     """Get credentials (legacy function)."""
     return _db_manager.get_credentials()
@@ -395,4 +580,16 @@ def remove_credential(index: int):
 
 def credential_exists(service: str, username: str) -> bool:
     """Check if credential exists (legacy function)."""
-    return _db_manager.credential_exists(service, username)
\ No newline at end of file
+    return _db_manager.credential_exists(service, username)
+
+def get_lookup_keys() -> Set[str]:
+    """Get lookup keys of stored credentials (legacy function)."""
+    return _db_manager.get_lookup_keys()
+
+def get_credentials_version() -> int:
+    """Get credential store write version (legacy function)."""
+    return _db_manager.get_version()
+
+def mark_credentials_changed():
+    """Invalidate cached listings after an external write (legacy function)."""
+    _db_manager.mark_changed()
\ No newline at end of file
@@ -2,9 +2,10 @@
 
 import json
 import os
+import tempfile
 from typing import List, Dict, Any
-from .db import get_credentials, add_credential
-from .crypto_utils import get_fernet
+from .db import get_credentials, add_credentials, get_lookup_keys
+from .crypto_utils import get_fernet, lookup_key
 
 class ImportResult:
     def __init__(self):
@@ -49,11 +50,22 @@ def export_credentials_json(filepath: str) -> bool:
         }
 
         fernet = get_fernet()
-        json_data = json.dumps(export_data, indent=2)
+        # Compact output: the file is encrypted anyway, and indent forces the pure-Python encoder
+        json_data = json.dumps(export_data, separators=(',', ':'))
         encrypted_data = fernet.encrypt(json_data.encode('utf-8'))
 
-        with open(filepath, "wb") as f:
-            f.write(encrypted_data)
+        # Write to a new owner-only temp file (mkstemp: O_EXCL, 0600) and rename it
+        # over the target, so a crash never leaves a partial backup
+        fd, tmp_path = tempfile.mkstemp(dir=dir_path or ".", prefix=".passguard-export-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(encrypted_data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
 
         print(f"✅ Exported {len(creds)} credential(s) to '{filepath}' (encrypted)")
         return True
@@ -73,12 +85,13 @@ def import_credentials_json(filepath: str) -> ImportResult:
         return result
 
     try:
+        # The ciphertext is only referenced during decryption, so it is freed before parsing starts
         with open(filepath, "rb") as f:
-            encrypted_data = f.read()
+            json_bytes = get_fernet().decrypt(f.read())
 
-        fernet = get_fernet()
-        json_data = fernet.decrypt(encrypted_data).decode('utf-8')
-        data = json.loads(json_data)
+        # json.loads reads the decrypted UTF-8 bytes directly, so no decoded copy is kept alongside them
+        data = json.loads(json_bytes)
+        del json_bytes
 
         if not isinstance(data, dict) or 'credentials' not in data:
             return result
@@ -87,44 +100,65 @@ def import_credentials_json(filepath: str) -> ImportResult:
         if not isinstance(credentials_list, list) or not credentials_list:
             return result
 
+        # Keys already stored plus those earlier in this file, to tell whether the import adds duplicates
+        seen_keys = get_lookup_keys()
+        creates_duplicates = False
+
+        valid_credentials = []
         for cred in credentials_list:
             try:
                 service = cred.get('service', '').strip()
                 username = cred.get('username', '').strip()
                 password = cred.get('password', '').strip()
 
-                if not all([service, username, password]):
+                if not (service and username and password):
                     result.errors += 1
                     result.error_details.append("Skipped invalid credential (empty fields)")
                     continue
 
-                add_credential(service, username, password, allow_duplicates=True)
-                result.imported += 1
+                key = lookup_key(service, username)
+                if key in seen_keys:
+                    creates_duplicates = True
+                else:
+                    seen_keys.add(key)
+                valid_credentials.append((service, username, password))
 
             except Exception as e:
                 result.errors += 1
                 error_msg = f"Failed to import {cred.get('service', 'unknown')}: {e}"
                 result.error_details.append(error_msg)
 
-        print(f"\n📈 Import Summary:")
-        print(f"   ✅ Credentials imported: {result.imported}")
-        print(f"   ❌ Errors: {result.errors}")
-
+        if valid_credentials:
+            try:
+                result.imported = add_credentials(valid_credentials)
+            except Exception as e:
+                result.errors += len(valid_credentials)
+                result.error_details.append(f"Failed to import credentials: {e}")
+
+        # Built up and printed in one write, however many rows failed
+        summary = [
+            "\n📈 Import Summary:",
+            f"   ✅ Credentials imported: {result.imported}",
+            f"   ❌ Errors: {result.errors}",
+        ]
         if result.error_details:
-            print(f"\n🚨 Error Details:")
-            for error in result.error_details:
-                print(f"   - {error}")
-
-        # ✅ Run duplicate cleanup after import
-        from modules.cleanup import DuplicateCleaner
-        cleaner = DuplicateCleaner()
-        duplicates = cleaner.find_duplicates()
-
-        if duplicates:
-            print("\n🧹 Running duplicate cleanup after import...")
-            cleaner.remove_duplicates(duplicates, confirm=True)
-        else:
-            print("\n✅ No duplicates found after import.")
+            summary.append("\n🚨 Error Details:")
+            summary.extend(f"   - {error}" for error in result.error_details)
+        print("\n".join(summary))
+
+        # ✅ Run duplicate cleanup after import, skipping the rescan when nothing collided
+        if creates_duplicates and result.imported:
+            from modules.cleanup import DuplicateCleaner
+            with DuplicateCleaner() as cleaner:
+                duplicates = cleaner.find_duplicates()
+                if duplicates:
+                    print("\n🧹 Running duplicate cleanup after import...")
+                    cleaner.remove_duplicates(duplicates, confirm=True)
+                else:
+                    print("\n✅ No duplicates found after import.")
+        elif result.imported:
+            # Only the imported rows were checked; existing duplicates are left to cleanup.py
+            print("\n✅ Import added no duplicates.")
 
         return result
 
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Credential Search Module
+Builds a casefolded substring and exact-match index over decrypted credentials.
+"""
+
+from bisect import bisect_right
+from typing import List, Tuple
+
+class SearchIndex:
+    """
+    Substring index over the service and username of loaded credentials.
+    
+    Each credential contributes one casefolded "service\\nusername" key and
+    all keys are joined with newlines into a single string, so a search is
+    a C-level str.find over one buffer instead of a Python loop over rows.
+    Row start offsets map each hit back to its credential. A newline can
+    never appear in a query line, so a match cannot span fields or rows.
+    The same keys in a dict give O(1) service + username duplicate checks.
+    """
+    
+    def __init__(self, credentials: List[Tuple[str, str, str]]):
+        """
+        Build the index.
+        
+        Args:
+            credentials (List[Tuple[str, str, str]]): (service, username, password) tuples
+        """
+        keys = [f"{service}\n{username}".casefold() for service, username, _ in credentials]
+        self._offsets = []
+        self._rows_by_key = {}
+        position = 0
+        for row, key in enumerate(keys):
+            self._offsets.append(position)
+            self._rows_by_key.setdefault(key, []).append(row)
+            position += len(key) + 1
+        self._text = "\n".join(keys)
+    
+    def matching_rows(self, query: str) -> List[int]:
+        """
+        Find credentials whose service or username contains the query.
+        
+        Args:
+            query (str): Casefolded search text
+        
+        Returns:
+            List[int]: Matching row indices in ascending order
+        """
+        if not query:
+            return list(range(len(self._offsets)))
+        
+        rows = []
+        last_row = len(self._offsets) - 1
+        pos = self._text.find(query)
+        while pos != -1:
+            row = bisect_right(self._offsets, pos) - 1
+            rows.append(row)
+            if row == last_row:
+                break
+            # Resume at the next row so each credential is reported once
+            pos = self._text.find(query, self._offsets[row + 1])
+        return rows
+    
+    def find_rows(self, service: str, username: str) -> List[int]:
+        """
+        Find credentials with exactly this service and username, ignoring case.
+        
+        Args:
+            service (str): Service name
+            username (str): Username/email
+        
+        Returns:
+            List[int]: Matching row indices, empty if there are none
+        """
+        return self._rows_by_key.get(f"{service}\n{username}".casefold(), [])
@@ -4,8 +4,9 @@ Session Management Module
 Handles user session timeouts and auto-lock functionality.
 """
 
+import math
 import time
-import threading
+from contextlib import contextmanager
 
 class SessionManager:
     """
@@ -14,7 +15,7 @@ class SessionManager:
     Features:
     - Configurable timeout period
     - Automatic session locking on inactivity
-    - Thread-safe timer management
+    - Monotonic-clock expiry checks, no timer threads
     - Session refresh capability
     """
     
@@ -27,62 +28,69 @@ class SessionManager:
         """
         self.timeout = timeout_seconds
         self.locked = False
-        self._timer = None
-        self._lock = threading.Lock()
-        
-    def _start_timer(self):
-        """Start or restart the session timeout timer."""
-        with self._lock:
-            if self._timer:
-                self._timer.cancel()
-            self._timer = threading.Timer(self.timeout, self._auto_lock)
-            self._timer.daemon = True
-            self._timer.start()
+        self._last_activity = None  # Monotonic time of the last refresh; None until started
     
-    def _auto_lock(self):
-        """Automatically lock the session (called by timer)."""
-        with self._lock:
-            self.locked = True
+    def _idle_seconds(self):
+        """Seconds since the last refresh, or 0 if the session was never started."""
+        if self._last_activity is None:
+            return 0.0
+        return time.monotonic() - self._last_activity
     
     def refresh(self):
         """
-        Refresh the session, resetting the timeout timer.
+        Refresh the session, resetting the timeout.
         Call this method after every user interaction.
+        
+        This only records the current monotonic time; expiry is
+        worked out when the session is checked.
+        """
+        self.locked = False
+        self._last_activity = time.monotonic()
+    
+    @contextmanager
+    def extended_timeout(self, timeout_seconds):
         """
-        with self._lock:
-            self.locked = False
-        self._start_timer()
+        Temporarily use a longer timeout for a long-running operation.
+        The original timeout is restored on exit, even if the block raises.
+        
+        Args:
+            timeout_seconds (int): Timeout to use inside the block
+        """
+        original_timeout = self.timeout
+        self.timeout = timeout_seconds
+        self.refresh()
+        try:
+            yield
+        finally:
+            self.timeout = original_timeout
+            self.refresh()
     
     def lock(self):
         """Manually lock the session."""
-        with self._lock:
-            self.locked = True
-            if self._timer:
-                self._timer.cancel()
+        self.locked = True
     
     def is_locked(self):
         """
-        Check if the session is currently locked.
+        Check if the session is currently locked, locking it if it has been idle too long.
         
         Returns:
             bool: True if session is locked, False otherwise
         """
-        with self._lock:
-            return self.locked
+        if not self.locked and self._idle_seconds() > self.timeout:
+            self.locked = True
+        return self.locked
     
     def stop(self):
-        """Stop the session manager and cancel any active timers."""
-        with self._lock:
-            if self._timer:
-                self._timer.cancel()
-                self._timer = None
+        """Stop the session manager; it no longer expires until refreshed again."""
+        self._last_activity = None
     
     def get_remaining_time(self):
         """
         Get remaining time before session locks.
         
         Returns:
-            int: Remaining seconds (approximation)
+            int: Remaining seconds
         """
-        # Note: This is an approximation since we don't track exact start time
-        return self.timeout if not self.is_locked() else 0
\ No newline at end of file
+        if self.is_locked():
+            return 0
+        return max(0, math.ceil(self.timeout - self._idle_seconds()))
\ No newline at end of file
@@ -1,17 +1,27 @@
 import os
-import pyotp
 from modules.config import SECURE_FOLDER
 
 TOTP_SECRET_FILE = os.path.join(SECURE_FOLDER, ".totp_secret")
 
+# Secret and pyotp.TOTP read once per process; reset whenever 2FA is enabled or disabled
+_secret = None
+_totp = None
+
+def _reset_cache():
+    global _secret, _totp
+    _secret = None
+    _totp = None
+
 def is_totp_enabled():
     return os.path.exists(TOTP_SECRET_FILE)
 
 def enable_totp():
     if not is_totp_enabled():
+        import pyotp  # Only needed once 2FA is in use; keeps startup light
         secret = pyotp.random_base32()
         with open(TOTP_SECRET_FILE, "w") as f:
             f.write(secret)
+        _reset_cache()
         print(f"[!] TOTP enabled. Scan this secret in your authenticator app:\n{secret}")
     else:
         print("[!] TOTP is already enabled.")
@@ -19,21 +29,26 @@ def enable_totp():
 def disable_totp():
     if is_totp_enabled():
         os.remove(TOTP_SECRET_FILE)
+        _reset_cache()
         print("[✓] TOTP disabled.")
     else:
         print("[!] TOTP is not enabled.")
 
 def get_or_create_totp_secret():
+    global _secret
     if not is_totp_enabled():
         enable_totp()
-    with open(TOTP_SECRET_FILE, "r") as f:
-        secret = f.read().strip()
-    return secret
+    if _secret is None:
+        with open(TOTP_SECRET_FILE, "r") as f:
+            _secret = f.read().strip()
+    return _secret
 
 def verify_totp(code):
     if not is_totp_enabled():
         print("❌ TOTP is not enabled.")
         return False
-    secret = get_or_create_totp_secret()
-    totp = pyotp.TOTP(secret)
-    return totp.verify(code)
\ No newline at end of file
+    global _totp
+    if _totp is None:
+        import pyotp
+        _totp = pyotp.TOTP(get_or_create_totp_secret())
+    return _totp.verify(code)
\ No newline at end of file
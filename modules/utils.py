@@ -1,18 +1,35 @@
 # modules/utils.py
 
 import os
-from modules.config import FILE_PERMISSION, FOLDER_PERMISSION, SECURE_FOLDER
+import ctypes
+import hmac
+from modules.config import FILE_PERMISSION, FOLDER_PERMISSION, SECURE_FOLDER, SESSION_TIMEOUT_FILE
 
 def set_secure_permissions(path):
     os.chmod(path, FILE_PERMISSION)
 
+def secure_zero(buf):
+    if len(buf):
+        ctypes.memset((ctypes.c_char * len(buf)).from_buffer(buf), 0, len(buf))
+
+def passwords_match(password, confirm):
+    # Compare in constant time via buffers we can wipe; str copies can't be zeroed
+    password_buf = bytearray(password, 'utf-8')
+    confirm_buf = bytearray(confirm, 'utf-8')
+    try:
+        return hmac.compare_digest(password_buf, confirm_buf)
+    finally:
+        secure_zero(password_buf)
+        secure_zero(confirm_buf)
+
 def ensure_secure_folder():
-    if not os.path.exists(SECURE_FOLDER):
+    try:
         os.makedirs(SECURE_FOLDER)
-        os.chmod(SECURE_FOLDER, FOLDER_PERMISSION)
+    except FileExistsError:
+        return
+    os.chmod(SECURE_FOLDER, FOLDER_PERMISSION)
 
 def load_session_timeout(default=180):
-    from modules.config import SESSION_TIMEOUT_FILE
     try:
         if os.path.exists(SESSION_TIMEOUT_FILE):
             with open(SESSION_TIMEOUT_FILE, "r") as f:
@@ -22,6 +39,5 @@ def load_session_timeout(default=180):
     return default
 
 def save_session_timeout(timeout):
-    from modules.config import SESSION_TIMEOUT_FILE
     with open(SESSION_TIMEOUT_FILE, "w") as f:
         f.write(str(timeout))
@@ -2,16 +2,20 @@
 
 import os
 import sys
+import hashlib
 import subprocess
-import platform
+import importlib.util
 from pathlib import Path
 
+_SUPPORTED_PLATFORMS = frozenset({"linux", "darwin"})
+
 class PassGuardSetup:
     def __init__(self):
         self.python_version = sys.version_info
-        self.platform = platform.system()
+        self.platform = sys.platform  # Fixed at interpreter startup; no need to import platform
         self.project_root = Path(__file__).parent
         self.requirements_file = self.project_root / "requirements.txt"
+        self.install_stamp = Path.home() / ".cache" / "passguard" / "installed.stamp"
 
     def check_python_version(self):
         print("🐍 Checking Python version...")
@@ -23,9 +27,10 @@ class PassGuardSetup:
 
     def check_platform(self):
         print(f"💻 Detected platform: {self.platform}")
-        if self.platform not in ["Linux", "Darwin"]:
+        if self.platform not in _SUPPORTED_PLATFORMS:
             print("⚠️  This app is designed for Linux/macOS.")
-            if input("Continue anyway? (y/N): ").lower() != 'y':
+            # Without a terminal to answer, take the default instead of blocking on input()
+            if not sys.stdin.isatty() or input("Continue anyway? (y/N): ").lower() != 'y':
                 return False
         print("✅ Platform supported!")
         return True
@@ -35,24 +40,41 @@ class PassGuardSetup:
         if not self.requirements_file.exists():
             print("❌ requirements.txt not found!")
             return False
+        # Skip pip entirely when these requirements were already installed into this interpreter
+        stamp = hashlib.blake2b(
+            self.requirements_file.read_bytes() + sys.executable.encode() + sys.version.encode()
+        ).hexdigest()
+        try:
+            if self.install_stamp.read_text() == stamp:
+                print("✅ Dependencies already up to date!")
+                return True
+        except OSError:
+            pass
+        # Look pip up without spawning an interpreter just to run `pip --version`
+        if importlib.util.find_spec("pip") is None:
+            print("❌ pip not found! Please install pip and try again.")
+            return False
         try:
-            subprocess.run([sys.executable, "-m", "pip", "--version"], check=True, capture_output=True)
-            cmd = [sys.executable, "-m", "pip", "install", "-r", str(self.requirements_file)]
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            cmd = [sys.executable, "-m", "pip", "install", "--disable-pip-version-check",
+                   "-r", str(self.requirements_file)]
+            # pip's progress goes straight to the terminal; only stderr is kept for the failure message
+            result = subprocess.run(cmd, stderr=subprocess.PIPE, text=True)
             if result.returncode == 0:
                 print("✅ Dependencies installed successfully!")
+                try:
+                    self.install_stamp.parent.mkdir(parents=True, exist_ok=True)
+                    self.install_stamp.write_text(stamp)
+                except OSError:
+                    pass
                 return True
             print(f"❌ Failed to install dependencies:\n{result.stderr}")
             return False
-        except subprocess.CalledProcessError:
-            print("❌ pip not found! Please install pip and try again.")
-            return False
         except Exception as e:
             print(f"❌ Error installing dependencies: {e}")
             return False
 
     def create_desktop_entry(self):
-        if self.platform != "Linux":
+        if self.platform != "linux":
             return True
         try:
             desktop_dir = Path.home() / ".local/share/applications"
@@ -69,27 +91,42 @@ Type=Application
 Categories=Utility;Security;
 StartupNotify=false
 """
-            with open(desktop_file, 'w') as f:
+            # Write a sibling and rename it into place, so a crash never leaves a half-written entry
+            tmp_file = desktop_file.with_suffix(".tmp")
+            with open(tmp_file, 'w') as f:
                 f.write(desktop_content)
-            desktop_file.chmod(0o755)
+                # Set the mode on the open descriptor rather than looking the path up again
+                os.fchmod(f.fileno(), 0o755)
+            os.replace(tmp_file, desktop_file)
             print("✅ Desktop entry created!")
             return True
         except Exception as e:
             print(f"⚠️  Could not create desktop entry: {e}")
             return True
 
+    def _has_alias(self, profile, alias_cmd):
+        try:
+            return alias_cmd in profile.read_text(errors='ignore')
+        except OSError:
+            return False
+
     def create_shell_alias(self):
         script_path = self.project_root / "main.py"
         alias_cmd = f"alias passguard='python3 {script_path}'"
-        print("\n💡 Tip: Add this alias to your shell profile:")
-        print(f"   {alias_cmd}")
         shell_profiles = [Path.home() / ".bashrc", Path.home() / ".zshrc", Path.home() / ".profile"]
         existing_profiles = [p for p in shell_profiles if p.exists()]
-        if existing_profiles:
-            print(f"\n🔧 Found profiles: {', '.join(p.name for p in existing_profiles)}")
+        # Rerunning setup must not stack up copies of the alias, nor ask again once every profile has it
+        missing_profiles = [p for p in existing_profiles if not self._has_alias(p, alias_cmd)]
+        if existing_profiles and not missing_profiles:
+            print("\n✅ Shell alias already set up.")
+            return
+        print("\n💡 Tip: Add this alias to your shell profile:")
+        print(f"   {alias_cmd}")
+        if missing_profiles and sys.stdin.isatty():
+            print(f"\n🔧 Found profiles: {', '.join(p.name for p in missing_profiles)}")
             if input("Add alias automatically? (y/N): ").lower() == 'y':
                 try:
-                    for profile in existing_profiles:
+                    for profile in missing_profiles:
                         with open(profile, 'a') as f:
                             f.write(f"\n# PassGuard alias\n{alias_cmd}\n")
                     print("✅ Alias added! Run 'source ~/.bashrc' to apply.")